@@ -62,6 +62,35 @@ if [[ -z "$REPO_NAME" ]]; then
     usage
 fi
 
+# Verify every package file has an entry in the database
+# Database entries are named <pkgname>-<pkgver>-<pkgrel>/, i.e. the filename
+# without the "-<arch>.pkg.tar.zst" suffix
+verify_database() {
+    local db="$1"
+    shift
+    local -A entries=()
+    local entry pkg
+    local missing=0
+
+    while IFS= read -r entry; do
+        entry="${entry#./}"
+        entries["${entry%/desc}"]=1
+    done < <(bsdtar -tf "$db" 2>/dev/null | grep '/desc$')
+
+    for pkg in "$@"; do
+        # Skip files repo-add --remove deleted because a newer version replaced them
+        [[ -f "$pkg" ]] || continue
+        entry="${pkg%.pkg.tar.zst}"
+        entry="${entry%-*}"
+        if [[ -z "${entries[$entry]:-}" ]]; then
+            log_error "Package missing from database: $pkg"
+            missing=1
+        fi
+    done
+
+    return "$missing"
+}
+
 # Update repository database
 update_repo() {
     local repo="$1"
@@ -75,15 +104,17 @@ update_repo() {
         return 1
     fi
 
-    # Check for package files
-    local pkg_count
-    pkg_count=$(find "$pkg_dir" -maxdepth 1 -name "*.pkg.tar.zst" 2>/dev/null | wc -l)
+    # List package files once; the same list is reused for epoch restoring
+    # and for repo-add instead of rescanning the directory. Sort bytewise so
+    # the order is cheap to compute and identical regardless of locale
+    local packages=()
+    mapfile -t packages < <(find "$pkg_dir" -maxdepth 1 -name "*.pkg.tar.zst" -printf "%f\n" 2>/dev/null | LC_ALL=C sort)
 
-    if [[ "$pkg_count" -eq 0 ]]; then
+    if [[ ${#packages[@]} -eq 0 ]]; then
         log_warn "No package files found in $pkg_dir"
         log_info "Creating empty repository database..."
     else
-        log_info "Found $pkg_count package(s) in $pkg_dir"
+        log_info "Found ${#packages[@]} package(s) in $pkg_dir"
     fi
 
     log_step "Generating repository database: $db_file"
@@ -92,32 +123,39 @@ update_repo() {
     pushd "$pkg_dir" > /dev/null
 
     # Restore epoch colons in filenames (sanitized for artifact upload)
-    for pkg in *_EPOCH_*.pkg.tar.zst; do
-        [[ -f "$pkg" ]] || continue
+    local i
+    for i in "${!packages[@]}"; do
+        local pkg="${packages[$i]}"
+        [[ "$pkg" == *_EPOCH_* ]] || continue
         local restored
         restored=$(restore_filename "$pkg")
         log_info "Restoring filename: $pkg -> $restored"
         mv "$pkg" "$restored"
+        packages[$i]="$restored"
     done
 
     # Remove old database files
     rm -f "${repo}.db" "${repo}.db.tar.gz"
     rm -f "${repo}.files" "${repo}.files.tar.gz"
 
-    # Get all package files
-    local packages
-    packages=$(find . -maxdepth 1 -name "*.pkg.tar.zst" -printf "%f\n" 2>/dev/null | sort)
-
-    if [[ -n "$packages" ]]; then
-        # Run repo-add for each package
-        for pkg in $packages; do
+    if [[ ${#packages[@]} -gt 0 ]]; then
+        # Add all packages in a single repo-add run so the database is only
+        # unpacked and rewritten once instead of once per package
+        for pkg in "${packages[@]}"; do
             log_info "Adding package: $pkg"
-            if ! repo-add "${repo_add_args[@]}" "${repo}.db.tar.gz" "$pkg"; then
-                log_error "Failed to add package: $pkg"
-                popd > /dev/null
-                return 1
-            fi
         done
+        if ! repo-add "${repo_add_args[@]}" "${repo}.db.tar.gz" "${packages[@]}"; then
+            log_error "Failed to add packages to database"
+            popd > /dev/null
+            return 1
+        fi
+
+        # repo-add only warns about packages it cannot read and still exits 0
+        # as long as one package was added, so check each one made it in
+        if ! verify_database "${repo}.db.tar.gz" "${packages[@]}"; then
+            popd > /dev/null
+            return 1
+        fi
     else
         # Create empty database
         log_info "Creating empty database..."
@@ -175,37 +213,3 @@ main() {
 }
 
 main
-
-# List repository contents
-list_repo() {
-    local pkg_dir="$1"
-
-    log_step "Repository contents:"
-    echo ""
-    echo "Database files:"
-    ls -la "$pkg_dir"/*.db* 2>/dev/null || echo "  (none)"
-    echo ""
-    echo "Files database:"
-    ls -la "$pkg_dir"/*.files* 2>/dev/null || echo "  (none)"
-    echo ""
-    echo "Packages:"
-    ls -la "$pkg_dir"/*.pkg.tar.zst 2>/dev/null || echo "  (none)"
-    echo ""
-}
-
-# Main execution
-main() {
-    log_step "Updating repository: $REPO_NAME"
-    log_info "Package directory: $PACKAGE_DIR"
-
-    if ! update_repo "$REPO_NAME" "$PACKAGE_DIR"; then
-        log_error "Failed to update repository"
-        exit 1
-    fi
-
-    list_repo "$PACKAGE_DIR"
-
-    log_info "Repository update completed successfully"
-}
-
-main